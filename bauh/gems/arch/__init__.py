@@ -14,6 +14,7 @@ CONFIG_DIR = '{}/.config/bauh/arch'.format(str(Path.home()))
 CUSTOM_MAKEPKG_FILE = '{}/makepkg.conf'.format(CONFIG_DIR)
 AUR_INDEX_FILE = '{}/aur/index.txt'.format(ARCH_CACHE_PATH)
 AUR_INDEX_TS_FILE = '{}/aur/index.ts'.format(ARCH_CACHE_PATH)
+AUR_SRCINFO_CACHE_DIR = '{}/aur/srcinfo'.format(ARCH_CACHE_PATH)
 CONFIG_FILE = '{}/arch.yml'.format(CONFIG_PATH)
 SUGGESTIONS_FILE = 'https://raw.githubusercontent.com/vinifmor/bauh-files/master/arch/aur_suggestions.txt'
 UPDATES_IGNORED_FILE = '{}/updates_ignored.txt'.format(CONFIG_DIR)
@@ -1,108 +1,223 @@
+import gzip
+import io
+import json
 import logging
 import os
 import re
+import tempfile
+import time
+import traceback
 import urllib.parse
-from typing import Set, List, Iterable, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+from typing import Set, List, Iterable, Dict, Optional, Callable, Generator
 
 import requests
+import urllib3
 
 from bauh.api.http import HttpClient
-from bauh.gems.arch import AUR_INDEX_FILE, git
+from bauh.gems.arch import AUR_INDEX_FILE, AUR_SRCINFO_CACHE_DIR, git
 from bauh.gems.arch.exceptions import PackageNotFoundException
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except:
+    ORJSON_AVAILABLE = False
+
 URL_INFO = 'https://aur.archlinux.org/rpc/?v=5&type=info&'
 URL_SRC_INFO = 'https://aur.archlinux.org/cgit/aur.git/plain/.SRCINFO?h='
 URL_SEARCH = 'https://aur.archlinux.org/rpc/?v=5&type=search&arg='
 URL_INDEX = 'https://aur.archlinux.org/packages.gz'
+GZIP_MAGIC_NUMBER = b'\x1f\x8b'
+INDEX_CHUNK_SIZE = 64 * 1024  # characters
+
+AUR_INFO_BATCH = 150  # max names per 'info' request (keeps the URL under the server limits)
+AUR_MAX_WORKERS = 4
+SRCINFO_CACHE_EXPIRATION = 30 * 24 * 60 * 60  # seconds (older .SRCINFO files cached on disk are removed)
+SRCINFO_MISSING_EXPIRATION = 5 * 60  # seconds
+MAX_RETRIES = 2
+RETRIABLE_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout, urllib3.exceptions.HTTPError)  # for direct 'requests' calls
 
 RE_SRCINFO_KEYS = re.compile(r'(\w+)\s+=\s+(.+)\n')
-RE_SPLIT_DEP = re.compile(r'[<>]?=')
-
-KNOWN_LIST_FIELDS = ('validpgpkeys',
-                     'checkdepends',
-                     'checkdepends_x86_64',
-                     'checkdepends_i686',
-                     'depends',
-                     'depends_x86_64',
-                     'depends_i686',
-                     'optdepends',
-                     'optdepends_x86_64',
-                     'optdepends_i686',
-                     'sha256sums',
-                     'sha256sums_x86_64',
-                     'sha512sums',
-                     'sha512sums_x86_64',
-                     'source',
-                     'source_x86_64',
-                     'source_i686',
-                     'makedepends',
-                     'makedepends_x86_64',
-                     'makedepends_i686',
-                     'provides',
-                     'conflicts')
+RE_SPLIT_DEP = re.compile(r'[<>]?=|[<>]')
+RE_PKGBUILD_KV = re.compile(r'\n(\w+)=(.+)')
+
+_STRIP_TABLE = str.maketrans('', '', '"\'()')
+
+KNOWN_LIST_FIELDS = frozenset({'validpgpkeys',
+                               'checkdepends',
+                               'checkdepends_x86_64',
+                               'checkdepends_i686',
+                               'depends',
+                               'depends_x86_64',
+                               'depends_i686',
+                               'optdepends',
+                               'optdepends_x86_64',
+                               'optdepends_i686',
+                               'sha256sums',
+                               'sha256sums_x86_64',
+                               'sha512sums',
+                               'sha512sums_x86_64',
+                               'source',
+                               'source_x86_64',
+                               'source_i686',
+                               'makedepends',
+                               'makedepends_x86_64',
+                               'makedepends_i686',
+                               'provides',
+                               'conflicts'})
+
+_KEY_FIELDS = frozenset(('pkgname', 'pkgbase'))
+
+
+def run_threads(target: Callable, args_list: List[tuple], max_workers: int = AUR_MAX_WORKERS) -> list:
+    """
+    :return: the results of the calls (in the same order of 'args_list'). The exception raised by any call is re-raised.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return [*executor.map(lambda args: target(*args), args_list)]
+
+
+def _is_connection_down(error: Exception) -> bool:
+    """
+    :return: if the connection could not even be established (e.g: no internet connection), so retrying is pointless
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, (urllib3.exceptions.NewConnectionError, urllib3.exceptions.ConnectTimeoutError))
+
+
+def strip_dep_version(dep: str) -> str:
+    """
+    :return: the dependency name without the version constraint (e.g: 'python>=3.5' -> 'python')
+    """
+    if '=' not in dep and '<' not in dep and '>' not in dep:  # most dependencies have no version constraint
+        return dep
+
+    return RE_SPLIT_DEP.split(dep, 1)[0]
+
+
+def is_src_info_version(srcinfo: dict, version: str) -> bool:
+    """
+    :param version: 'pkgver-pkgrel' (the epoch is ignored)
+    """
+    pkgver, pkgrel = srcinfo.get('pkgver'), srcinfo.get('pkgrel')
+    return version.split(':')[-1] == ('{}-{}'.format(pkgver, pkgrel) if pkgrel else pkgver)
 
 
 def map_pkgbuild(pkgbuild: str) -> dict:
-    return {attr: val.replace('"', '').replace("'", '').replace('(', '').replace(')', '') for attr, val in re.findall(r'\n(\w+)=(.+)', pkgbuild)}
+    return {attr: val.translate(_STRIP_TABLE) for attr, val in RE_PKGBUILD_KV.findall(pkgbuild)}
+
+
+class SrcSub:
+    """
+    The fields of a .SRCINFO section ('pkgbase' or 'pkgname') split by type
+    """
+    __slots__ = ('pkgname', 'lists', 'scalars')
+
+    def __init__(self, pkgname: Optional[str] = None):
+        self.pkgname = pkgname
+        self.lists = {}
+        self.scalars = {}
+
+
+def _is_positional_field(field: str) -> bool:
+    """
+    positional fields must keep their repeated values (e.g: several 'SKIP' checksums aligned with the 'source' entries)
+    """
+    return field.startswith('source') or 'sums' in field
+
+
+# how each .SRCINFO field is handled by 'map_srcinfo'
+_FIELD_LIST, _FIELD_SCALAR, _FIELD_SECTION, _FIELD_SECTION_SKIP, _FIELD_SKIP = range(5)
+
+_SRCINFO_FIELD_TYPES = {**{field: _FIELD_LIST for field in KNOWN_LIST_FIELDS},
+                        **{field: _FIELD_SECTION for field in _KEY_FIELDS}}
 
 
 def map_srcinfo(string: str, pkgname: Optional[str], fields: Set[str] = None) -> dict:
-    subinfos, subinfo = [], {}
+    if fields:  # the fields not requested are skipped (the key fields still delimit the sections)
+        field_types = {f: _SRCINFO_FIELD_TYPES.get(f, _FIELD_SCALAR) for f in fields}
+
+        for field in _KEY_FIELDS:
+            if field not in fields:
+                field_types[field] = _FIELD_SECTION_SKIP
+
+        default_type = _FIELD_SKIP
+    else:
+        field_types, default_type = _SRCINFO_FIELD_TYPES, _FIELD_SCALAR
 
-    key_fields = {'pkgname', 'pkgbase'}
+    sub = SrcSub()
+    subinfos = [sub]
+    lists, scalars = sub.lists, sub.scalars
 
-    for field in RE_SRCINFO_KEYS.findall(string):
-        key = field[0].strip()
-        val = field[1].strip()
+    for key, val in RE_SRCINFO_KEYS.findall(string):
+        field_type = field_types.get(key, default_type)
 
-        if subinfo and key in key_fields:
-            subinfos.append(subinfo)
-            subinfo = {key: val}
-        elif not fields or key in fields:
-            if key not in subinfo:
-                subinfo[key] = {val} if key in KNOWN_LIST_FIELDS else val
+        if field_type == _FIELD_LIST:
+            current_val = lists.get(key)
+
+            if current_val is None:
+                lists[key] = [val.strip()]
+            else:
+                current_val.append(val.strip())
+
+        elif field_type == _FIELD_SCALAR:
+            current_val = lists.get(key)
+
+            if current_val is not None:
+                current_val.append(val.strip())
+            elif key in scalars:  # unknown fields declared several times (e.g: 'arch')
+                lists[key] = [scalars.pop(key), val.strip()]
             else:
-                if not isinstance(subinfo[key], set):
-                    subinfo[key] = {subinfo[key]}
+                scalars[key] = val.strip()
 
-                subinfo[key].add(val)
+        elif field_type != _FIELD_SKIP:  # a new section
+            val = val.strip()
+            sub = SrcSub(pkgname=val if key == 'pkgname' else None)
+            subinfos.append(sub)
+            lists, scalars = sub.lists, sub.scalars
 
-    if subinfo:
-        subinfos.append(subinfo)
+            if field_type == _FIELD_SECTION:
+                scalars[key] = val
 
-    pkgnames = {s['pkgname'] for s in subinfos if 'pkgname' in s}
+    pkgnames = {s.pkgname for s in subinfos if s.pkgname}
     return merge_subinfos(subinfos=subinfos,
-                          pkgname=None if (not pkgname or len(pkgnames) == 1 or pkgname not in pkgnames) else pkgname,
-                          fields=fields)
+                          pkgname=None if (not pkgname or len(pkgnames) == 1 or pkgname not in pkgnames) else pkgname)
 
 
-def merge_subinfos(subinfos: List[dict], pkgname: Optional[str] = None, fields: Optional[Set[str]] = None) -> dict:
-    info = {}
-    for subinfo in subinfos:
-        if not pkgname or subinfo.get('pkgname') in {None, pkgname}:
-            for key, val in subinfo.items():
-                if not fields or key in fields:
-                    current_val = info.get(key)
+def merge_subinfos(subinfos: List[SrcSub], pkgname: Optional[str] = None) -> dict:
+    lists, scalars = {}, {}
 
-                    if current_val is None:
-                        info[key] = val
-                    else:
-                        if not isinstance(current_val, set):
-                            current_val = {current_val}
-                            info[key] = current_val
+    for sub in subinfos:
+        if not pkgname or sub.pkgname is None or sub.pkgname == pkgname:
+            for key, val in sub.scalars.items():
+                current_val = lists.get(key)
 
-                        if isinstance(val, set):
-                            current_val.update(val)
-                        else:
-                            current_val.add(val)
+                if current_val is not None:
+                    current_val.append(val)
+                elif key in scalars:  # declared by several sections
+                    lists[key] = [scalars.pop(key), val]
+                else:
+                    scalars[key] = val
 
-    for field in info.keys():
-        val = info.get(field)
+            for key, val in sub.lists.items():
+                current_val = lists.get(key)
 
-        if isinstance(val, set):
-            info[field] = [*val]
+                if current_val is None:
+                    lists[key] = [scalars.pop(key), *val] if key in scalars else [*val]
+                else:
+                    current_val.extend(val)
 
-    return info
+    for key, val in lists.items():
+        # removing duplicates (keeping the declaration order), except from the positional fields
+        scalars[key] = val if _is_positional_field(key) else [*dict.fromkeys(val)]
+
+    return scalars
 
 
 class AURClient:
@@ -112,37 +227,111 @@ class AURClient:
         self.logger = logger
         self.x86_64 = x86_64
         self.srcinfo_cache = {}
+        self._srcinfo_cache_lock = Lock()
+        self._srcinfo_missing = {}  # package name -> time.monotonic() of when the AUR returned no package with this name
+        self._srcinfo_bases = {}  # package name -> package base (when they are different)
+        self._srcinfo_texts = {}  # package base -> raw .SRCINFO (shared by the packages of the same base)
+        self._srcinfo_text_locks = {}  # package base -> Lock
+
+        self._arch = 'x86_64' if x86_64 else 'i686'
+        self._dep_attrs = ('makedepends', 'makedepends_' + self._arch,
+                           'depends', 'depends_' + self._arch,
+                           'checkdepends', 'checkdepends_' + self._arch)
 
     def search(self, words: str) -> dict:
-        return self.http_client.get_json(URL_SEARCH + words)
+        return self._get_json(URL_SEARCH + words)
+
+    def _get_json(self, url: str) -> Optional[dict]:
+        res = self.http_client.get(url)
+
+        if res:
+            return orjson.loads(res.content) if ORJSON_AVAILABLE else res.json()
 
     def get_info(self, names: Iterable[str]) -> List[dict]:
-        try:
-            res = self.http_client.get_json(URL_INFO + self._map_names_as_queries(names))
-            return res['results'] if res and res.get('results') else []
-        except:
+        names = [*names]
+
+        if not names:
             return []
 
-    def get_src_info(self, name: str, real_name: Optional[str] = None) -> dict:
+        batches = [names[i:i + AUR_INFO_BATCH] for i in range(0, len(names), AUR_INFO_BATCH)]
+
+        if len(batches) == 1:
+            return self._get_info_batch(batches[0]) or []
+
+        results = run_threads(self._get_info_batch, [(batch,) for batch in batches])
+        return [info for batch_res in results if batch_res for info in batch_res]
+
+    def _get_info_batch(self, names: List[str]) -> Optional[List[dict]]:
+        """
+        :return: the AUR data found for the given names or None if it could not be retrieved
+        """
+        url = URL_INFO + self._map_names_as_queries(names)
+
+        for attempt in range(1, MAX_RETRIES + 2):
+            try:
+                res = self._get_json(url)
+                return (res.get('results') or []) if res is not None else None
+            except requests.exceptions.ConnectionError as e:  # raised by HttpClient on its first attempt (it retries the other errors itself)
+                if _is_connection_down(e):
+                    break
+
+                if attempt <= MAX_RETRIES:
+                    time.sleep(0.5 * attempt)
+            except ValueError:  # invalid JSON
+                self.logger.error('Invalid data returned for the AUR data of {} package(s)'.format(len(names)))
+                traceback.print_exc()
+                return
+
+        self.logger.warning('No internet connection: could not retrieve the AUR data of {} package(s)'.format(len(names)))
+
+    def get_src_info(self, name: str, real_name: Optional[str] = None, last_modified: Optional[int] = None,
+                     latest_version: Optional[str] = None) -> dict:
+        """
+        :param name: package name (or the package base name if 'real_name' is informed)
+        :param real_name: the package name when 'name' is its base. The returned data is only cached for the requested package (never for the base).
+        :param last_modified: the package 'LastModified' field returned by the AUR API (if known). Disk cached data older than it is ignored.
+        :param latest_version: the package latest version (pkgver-pkgrel) returned by the AUR API (if known). Cached data declaring a different version is ignored.
+        The data cached on disk is only used if 'last_modified' or 'latest_version' is informed.
+        """
+        if real_name:
+            return self._map_base_src_info(base=name, pkgname=real_name)
+
         srcinfo = self.srcinfo_cache.get(name)
 
+        if srcinfo and (not latest_version or is_src_info_version(srcinfo, latest_version)):
+            return srcinfo
+
+        missing_since = self._srcinfo_missing.get(name)
+
+        if missing_since is not None and time.monotonic() - missing_since < SRCINFO_MISSING_EXPIRATION:
+            return
+
+        base = self._srcinfo_bases.get(name)
+
+        if base:
+            return self._get_src_info_from_base(name, base, last_modified, latest_version)
+
+        srcinfo = self._read_cached_src_info(name, last_modified, latest_version)
+
         if srcinfo:
+            self._cache_src_info(name, srcinfo)
             return srcinfo
 
         res = self.http_client.get(URL_SRC_INFO + urllib.parse.quote(name))
 
         if res and res.text:
-            srcinfo = map_srcinfo(string=res.text, pkgname=real_name if real_name else name)
+            srcinfo = map_srcinfo(string=res.text, pkgname=name)
 
             if srcinfo:
-                self.srcinfo_cache[name] = srcinfo
+                self._cache_src_info(name, srcinfo)
+                self._write_cached_src_info(name, srcinfo)
 
             return srcinfo
 
         self.logger.warning('No .SRCINFO found for {}'.format(name))
         self.logger.info('Checking if {} is based on another package'.format(name))
         # if was not found, it may be based on another package.
-        infos = self.get_info({name})
+        infos = self._get_info_batch([name])
 
         if infos:
             info = infos[0]
@@ -151,25 +340,147 @@ class AURClient:
             info_base = info.get('PackageBase')
             if info_name and info_base and info_name != info_base:
                 self.logger.info('{p} is based on {b}. Retrieving {b} .SRCINFO'.format(p=info_name, b=info_base))
-                srcinfo = self.get_src_info(name=info_base, real_name=info_name)
+                self._srcinfo_bases[name] = info_base
+                return self._get_src_info_from_base(name, info_base)
+        elif infos is not None:  # only remembered as missing if the AUR has really no package with this name
+            self._srcinfo_missing[name] = time.monotonic()
+
+    def _map_base_src_info(self, base: str, pkgname: str) -> Optional[dict]:
+        """
+        maps the .SRCINFO of 'base' for one of its packages. The raw .SRCINFO is kept in memory, so the other packages of the same base do not download it again.
+        """
+        with self._srcinfo_cache_lock:
+            base_lock = self._srcinfo_text_locks.setdefault(base, Lock())
+
+        with base_lock:  # the packages of the same base being retrieved concurrently wait for a single download
+            text = self._srcinfo_texts.get(base)
+
+            if text is None:
+                res = self.http_client.get(URL_SRC_INFO + urllib.parse.quote(base))
+
+                if not res or not res.text:
+                    return
+
+                text = res.text
+                self._srcinfo_texts[base] = text
+
+        return map_srcinfo(string=text, pkgname=pkgname)
+
+    def _get_src_info_from_base(self, name: str, base: str, last_modified: Optional[int] = None,
+                                latest_version: Optional[str] = None) -> Optional[dict]:
+        srcinfo = self._read_cached_src_info(name, last_modified, latest_version)
+
+        if srcinfo:
+            self._cache_src_info(name, srcinfo)
+            return srcinfo
+
+        srcinfo = self._map_base_src_info(base=base, pkgname=name)
+
+        if srcinfo:
+            self._cache_src_info(name, srcinfo)
+            self._write_cached_src_info(name, srcinfo)
 
-                if srcinfo:
-                    self.srcinfo_cache[name] = srcinfo
+        return srcinfo
 
-                return srcinfo
+    def _read_cached_src_info(self, name: str, last_modified: Optional[int] = None, latest_version: Optional[str] = None) -> Optional[dict]:
+        """
+        The cached data can only be validated against the AUR data, so nothing is returned if neither 'last_modified' nor 'latest_version' are informed.
+
+        :param last_modified: the package 'LastModified' timestamp returned by the AUR API. Files cached before it are ignored.
+        :param latest_version: if informed, the cached data is only returned if it declares this version
+        """
+        if last_modified is None and not latest_version:
+            return
+
+        cache_file = '{}/{}.json'.format(AUR_SRCINFO_CACHE_DIR, name)
+
+        try:
+            cached_at = os.path.getmtime(cache_file)
+        except OSError:
+            return
+
+        if last_modified is not None and cached_at < last_modified:
+            return
+
+        try:
+            with open(cache_file) as f:
+                srcinfo = json.load(f)
+        except:
+            self.logger.warning("Could not read the cached .SRCINFO of '{}' ({})".format(name, cache_file))
+            traceback.print_exc()
+            return
+
+        if latest_version and not is_src_info_version(srcinfo, latest_version):
+            self.logger.info("Cached .SRCINFO of '{}' is outdated (latest version: {})".format(name, latest_version))
+            return
+
+        return srcinfo
+
+    def _write_cached_src_info(self, name: str, srcinfo: dict):
+        try:
+            os.makedirs(AUR_SRCINFO_CACHE_DIR, exist_ok=True)
+            fd, temp_file = tempfile.mkstemp(dir=AUR_SRCINFO_CACHE_DIR, prefix='.{}'.format(name))
+
+            with os.fdopen(fd, 'w') as f:
+                json.dump(srcinfo, f)
+
+            os.replace(temp_file, '{}/{}.json'.format(AUR_SRCINFO_CACHE_DIR, name))
+        except:
+            self.logger.warning("Could not cache the .SRCINFO of '{}' on disk".format(name))
+            traceback.print_exc()
+
+    def _cache_src_info(self, name: str, srcinfo: dict):
+        with self._srcinfo_cache_lock:
+            self.srcinfo_cache[name] = srcinfo
+
+    def prefetch_src_infos(self, names: Iterable[str], workers: int = AUR_MAX_WORKERS):
+        """
+        Concurrently retrieves the .SRCINFO of the given packages, so the next 'get_src_info' calls for them are served by 'srcinfo_cache'.
+        """
+        self.get_src_info_many(names, max_workers=workers)
+
+    def get_src_info_many(self, names: Iterable[str], max_workers: int = AUR_MAX_WORKERS) -> Dict[str, dict]:
+        """
+        Retrieves the .SRCINFO of several packages. The AUR data of the not cached ones is retrieved in batches first,
+        so the packages based on another one are directly fetched from their base.
+        """
+        res, to_fetch = {}, {}
+
+        for name in names:
+            srcinfo = self.srcinfo_cache.get(name)
+
+            if srcinfo:
+                res[name] = srcinfo
+            else:
+                to_fetch[name] = (None, None)  # 'LastModified' and 'Version' returned by the AUR API
+
+        if not to_fetch:
+            return res
+
+        for info in self.get_info(to_fetch.keys()):
+            info_name, info_base = info.get('Name'), info.get('PackageBase')
+
+            if info_name in to_fetch:
+                to_fetch[info_name] = (info.get('LastModified'), info.get('Version'))
+
+                if info_base and info_base != info_name:
+                    self._srcinfo_bases[info_name] = info_base
+
+        fetched = run_threads(self._get_latest_src_info, [(name, *data) for name, data in to_fetch.items()], max_workers)
+        res.update((name, srcinfo) for name, srcinfo in zip(to_fetch, fetched) if srcinfo)
+        return res
+
+    def _get_latest_src_info(self, name: str, last_modified: Optional[int], latest_version: Optional[str]) -> Optional[dict]:
+        return self.get_src_info(name, last_modified=last_modified, latest_version=latest_version)
 
     def extract_required_dependencies(self, srcinfo: dict) -> Set[str]:
         deps = set()
 
-        for attr in ('makedepends',
-                     'makedepends_{}'.format('x86_64' if self.x86_64 else 'i686'),
-                     'depends',
-                     'depends_{}'.format('x86_64' if self.x86_64 else 'i686'),
-                     'checkdepends',
-                     'checkdepends_{}'.format('x86_64' if self.x86_64 else 'i686')):
+        for attr in self._dep_attrs:
+            attr_deps = srcinfo.get(attr)
 
-            if srcinfo.get(attr):
-                deps.update(srcinfo[attr])
+            if attr_deps:
+                deps.update(attr_deps)
 
         return deps
 
@@ -182,7 +493,7 @@ class AURClient:
         return self.extract_required_dependencies(info)
 
     def _map_names_as_queries(self, names) -> str:
-        return '&'.join(['arg[{}]={}'.format(i, urllib.parse.quote(n)) for i, n in enumerate(names)])
+        return urllib.parse.urlencode([('arg[]', n) for n in names])
 
     def read_local_index(self) -> dict:
         self.logger.info('Checking if the cached AUR index file exists')
@@ -190,28 +501,62 @@ class AURClient:
             self.logger.info('Reading AUR index file from {}'.format(AUR_INDEX_FILE))
             index = {}
             with open(AUR_INDEX_FILE) as f:
-                for l in f.readlines():
-                    if l:
-                        lsplit = l.split('=')
-                        index[lsplit[0]] = lsplit[1].strip()
+                for l in f:
+                    key, sep, val = l.partition('=')
+
+                    if sep:
+                        index[key] = val.rstrip()
             self.logger.info("AUR index file read")
             return index
         self.logger.warning('The AUR index file was not found')
 
     def download_names(self) -> Set[str]:
         self.logger.info('Downloading AUR index')
-        try:
-            res = self.http_client.get(URL_INDEX)
 
-            if res and res.text:
-                return {n.strip() for n in res.text.split('\n') if n and not n.startswith('#')}
-            else:
-                self.logger.warning('No data returned from: {}'.format(URL_INDEX))
-        except requests.exceptions.ConnectionError:
-            self.logger.warning('No internet connection: could not pre-index packages')
+        for attempt in range(1, MAX_RETRIES + 2):
+            try:
+                # streaming the index (it is big) instead of loading the whole decompressed content in memory
+                with requests.get(URL_INDEX, stream=True, timeout=self.http_client.timeout) as res:
+                    if res.status_code == 200:
+                        names = {n for n in self._read_index_lines(res) if n and n[0] != '#'}
+
+                        if names:
+                            return names
+
+                    self.logger.warning('No data returned from: {}'.format(URL_INDEX))
+                    break
+            except RETRIABLE_ERRORS as e:
+                if attempt <= MAX_RETRIES and not _is_connection_down(e):
+                    time.sleep(0.5 * attempt)
+                else:
+                    self.logger.warning('No internet connection: could not pre-index packages')
+                    break
+            except (OSError, EOFError, UnicodeDecodeError):
+                self.logger.error("Could not read the AUR index from '{}'".format(URL_INDEX))
+                traceback.print_exc()
+                break
 
         self.logger.info("Finished")
 
+    @staticmethod
+    def _read_index_lines(res: requests.Response) -> Generator[str, None, None]:
+        res.raw.decode_content = True  # decoding the 'Content-Encoding' (if declared)
+        stream = io.BufferedReader(res.raw)
+
+        if stream.peek(2)[:2] == GZIP_MAGIC_NUMBER:  # the content is a raw gzip file
+            stream = gzip.GzipFile(fileobj=stream)
+
+        text, pending = io.TextIOWrapper(stream, encoding='utf-8'), ''
+
+        # splitting big decoded chunks (the index lines have no surrounding whitespaces) instead of iterating line by line
+        for chunk in iter(partial(text.read, INDEX_CHUNK_SIZE), ''):
+            lines = (pending + chunk).split('\n')
+            pending = lines.pop()  # the last line may be incomplete
+            yield from lines
+
+        if pending:
+            yield pending
+
     def read_index(self) -> Iterable[str]:
         try:
             index = self.read_local_index()
@@ -227,31 +572,45 @@ class AURClient:
                     return set()
             else:
                 return index.values()
-        except:
+        except (OSError, ValueError):
+            self.logger.error("Could not read the AUR index file '{}'".format(AUR_INDEX_FILE))
+            traceback.print_exc()
             return set()
 
     def clean_caches(self):
         self.srcinfo_cache.clear()
+        self._srcinfo_texts.clear()
+        self._srcinfo_missing.clear()
+        self._remove_expired_cached_src_infos()
 
-    def map_update_data(self, pkgname: str, latest_version: Optional[str], srcinfo: Optional[dict] = None) -> dict:
-        info = self.get_src_info(pkgname) if not srcinfo else srcinfo
+    def _remove_expired_cached_src_infos(self):
+        try:
+            cached_files = os.scandir(AUR_SRCINFO_CACHE_DIR)
+        except OSError:  # nothing cached yet
+            return
 
-        provided = set()
-        provided.add(pkgname)
+        expired_before = time.time() - SRCINFO_CACHE_EXPIRATION
 
-        if info:
-            provided.add('{}={}'.format(pkgname, info['pkgver']))
-            if info.get('provides'):
-                provided.update(info.get('provides'))
+        with cached_files:
+            for cached_file in cached_files:
+                try:
+                    if cached_file.stat().st_mtime < expired_before:
+                        os.remove(cached_file.path)
+                except OSError:
+                    self.logger.warning("Could not remove the expired cached .SRCINFO file '{}'".format(cached_file.path))
 
-            return {'c': info.get('conflicts'), 's': None, 'p': provided, 'r': 'aur',
-                    'v': info['pkgver'], 'd': self.extract_required_dependencies(info),
-                    'b': info.get('pkgbase', pkgname)}
-        else:
-            if latest_version:
-                provided.add('{}={}'.format(pkgname, latest_version))
+    def map_update_data(self, pkgname: str, latest_version: Optional[str], srcinfo: Optional[dict] = None) -> dict:
+        info = self.get_src_info(pkgname, latest_version=latest_version) if not srcinfo else srcinfo
 
-            return {'c': None, 's': None, 'p': provided, 'r': 'aur', 'v': latest_version, 'd': set(), 'b': pkgname}
+        if info:
+            version = info['pkgver']
+            return {'c': info.get('conflicts'), 's': None, 'r': 'aur', 'v': version,
+                    'p': {pkgname, '{}={}'.format(pkgname, version), *(info.get('provides') or ())},
+                    'd': self.extract_required_dependencies(info), 'b': info.get('pkgbase', pkgname)}
+        else:
+            return {'c': None, 's': None, 'r': 'aur', 'v': latest_version,
+                    'p': {pkgname, '{}={}'.format(pkgname, latest_version)} if latest_version else {pkgname},
+                    'd': set(), 'b': pkgname}
 
     def fill_update_data(self, output: Dict[str, dict], pkgname: str, latest_version: str, srcinfo: dict = None):
         data = self.map_update_data(pkgname=pkgname, latest_version=latest_version, srcinfo=srcinfo)
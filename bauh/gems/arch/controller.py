@@ -46,7 +46,6 @@ from bauh.gems.arch.exceptions import PackageNotFoundException, PackageInHoldExc
 from bauh.gems.arch.mapper import AURDataMapper
 from bauh.gems.arch.model import ArchPackage
 from bauh.gems.arch.output import TransactionStatusHandler
-from bauh.gems.arch.pacman import RE_DEP_OPERATORS
 from bauh.gems.arch.updates import UpdatesSummarizer
 from bauh.gems.arch.worker import AURIndexUpdater, ArchDiskCacheUpdater, ArchCompilationOptimizer, RefreshMirrors, \
     SyncDatabases
@@ -1509,7 +1508,7 @@ class ArchManager(SoftwareManager):
                 info['09_last_modified'] = self._parse_timestamp(ts=pkg.last_modified,
                                                                  error_msg="Could not parse AUR package '{}' 'last_modified' field ({})".format(pkg.name, pkg.last_modified))
 
-            srcinfo = self.aur_client.get_src_info(pkg.name)
+            srcinfo = self.aur_client.get_src_info(pkg.name, latest_version=pkg.latest_version)
 
             if srcinfo:
                 arch_str = 'x86_64' if self.context.is_system_x86_64() else 'i686'
@@ -2080,7 +2079,7 @@ class ArchManager(SoftwareManager):
                     if dep_list and isinstance(dep_list, list):
                         to_remove = set()
                         for dep in dep_list:
-                            dep_name = RE_DEP_OPERATORS.split(dep.split(':')[0])[0].strip()
+                            dep_name = aur.strip_dep_version(dep.split(':')[0]).strip()
 
                             if dep_name and dep_name in context.pkgs_to_build:
                                 to_remove.add(dep)
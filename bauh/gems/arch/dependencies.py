@@ -40,6 +40,12 @@ class DependenciesAnalyser:
 
         output.append((name, ''))
 
+    def _prefetch_aur_src_infos(self, names: Iterable[str]):
+        names = [*names]
+
+        if len(names) > 1:  # the dependencies of each package are read next
+            self.aur_client.prefetch_src_infos(names)
+
     def get_missing_packages(self, names: Set[str], repository: str = None, in_analysis: Set[str] = None) -> List[
         Tuple[str, str]]:
         """
@@ -78,6 +84,8 @@ class DependenciesAnalyser:
                     missing_root.append((missing, repository))
                     global_in_analysis.add(missing)
 
+            self._prefetch_aur_src_infos([rdep[0] for rdep in missing_root if rdep[1] == 'aur'])
+
             missing_sub = []
             for rdep in missing_root:
                 subdeps = self.aur_client.get_required_dependencies(rdep[0]) if rdep[1] == 'aur' else pacman.read_dependencies(rdep[0])
@@ -101,6 +109,9 @@ class DependenciesAnalyser:
         already_added = {*names}
         in_analyses = {*names}
 
+        if repository == 'aur':
+            self._prefetch_aur_src_infos(names)
+
         for name in names:
             subdeps = self.aur_client.get_required_dependencies(name) if repository == 'aur' else pacman.read_dependencies(name)
 
@@ -292,9 +303,6 @@ class DependenciesAnalyser:
         else:
             raise PackageNotFoundException(dep_exp)
 
-    def __fill_aur_update_data(self, pkgname: str, output: dict):
-        output[pkgname] = self.aur_client.map_update_data(pkgname, None)
-
     def map_missing_deps(self, pkgs_data: Dict[str, dict], provided_map: Dict[str, Set[str]],
                          remote_provided_map: Dict[str, Set[str]], remote_repo_map: Dict[str, str],
                          aur_index: Iterable[str], deps_checked: Set[str], deps_data: Dict[str, dict],
@@ -372,14 +380,10 @@ class DependenciesAnalyser:
                         deps_data.update(data)
 
             if aur_missing:
-                aur_threads = []
-                for pkgname in aur_missing:
-                    t = Thread(target=self.__fill_aur_update_data, args=(pkgname, deps_data), daemon=True)
-                    t.start()
-                    aur_threads.append(t)
+                srcinfos = self.aur_client.get_src_info_many(aur_missing)
 
-                for t in aur_threads:
-                    t.join()
+                for pkgname in aur_missing:
+                    deps_data[pkgname] = self.aur_client.map_update_data(pkgname, None, srcinfo=srcinfos.get(pkgname))
 
             missing_subdeps = self.map_missing_deps(pkgs_data={**deps_data}, provided_map=provided_map, aur_index=aur_index,
                                                     deps_checked=deps_checked, sort=False, deps_data=deps_data,
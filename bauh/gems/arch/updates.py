@@ -1,13 +1,12 @@
 import logging
 import time
 import traceback
-from threading import Thread
 from typing import Dict, Set, List, Tuple, Iterable, Optional
 
 from bauh.api.abstract.controller import UpgradeRequirements, UpgradeRequirement
 from bauh.api.abstract.handler import ProcessWatcher
 from bauh.gems.arch import pacman, sorting
-from bauh.gems.arch.aur import AURClient
+from bauh.gems.arch.aur import AURClient, strip_dep_version
 from bauh.gems.arch.dependencies import DependenciesAnalyser
 from bauh.gems.arch.exceptions import PackageNotFoundException
 from bauh.gems.arch.model import ArchPackage
@@ -54,9 +53,6 @@ class UpdatesSummarizer:
         self.deps_analyser = deps_analyser
         self.aur_supported = aur_supported
 
-    def _fill_aur_pkg_update_data(self, pkg: ArchPackage, output: dict):
-        output[pkg.name] = self.aur_client.map_update_data(pkg.get_base_name(), pkg.latest_version)
-
     def _handle_conflict_both_to_install(self, pkg1: str, pkg2: str, context: UpdateRequirementsContext):
         for src_pkg in {p for p, data in context.pkgs_data.items() if
                         data['d'] and pkg1 in data['d'] or pkg2 in data['d']}:
@@ -352,7 +348,7 @@ class UpdatesSummarizer:
                             if deps is None:
                                 deps = set()
                             else:
-                                deps = {RE_DEP_OPERATORS.split(d)[0] for d in deps}
+                                deps = {strip_dep_version(d) for d in deps}
 
                             to_sync_deps_cache[p] = deps
 
@@ -380,20 +376,19 @@ class UpdatesSummarizer:
         self.__fill_aur_index(context)
 
         aur_data = {}
-        aur_srcinfo_threads = []
         for p in pkgs:
             context.to_update[p.name] = p
             if p.repository == 'aur':
                 context.aur_to_update[p.name] = p
-                t = Thread(target=self._fill_aur_pkg_update_data, args=(p, aur_data), daemon=True)
-                t.start()
-                aur_srcinfo_threads.append(t)
             else:
                 context.repo_to_update[p.name] = p
 
         if context.aur_to_update:
-            for t in aur_srcinfo_threads:
-                t.join()
+            srcinfos = self.aur_client.get_src_info_many({p.get_base_name() for p in context.aur_to_update.values()})
+
+            for p in context.aur_to_update.values():
+                base = p.get_base_name()
+                aur_data[p.name] = self.aur_client.map_update_data(base, p.latest_version, srcinfo=srcinfos.get(base))
 
         self.logger.info("Filling updates data")
 
@@ -1,13 +1,50 @@
+import gzip
+import io
+import json
 import os
+import tempfile
+import time
+from threading import Event
+from typing import Dict, List, Optional
 from unittest import TestCase
+from unittest.mock import Mock, patch
+
+import requests
+import urllib3
 
 from bauh.gems.arch import aur
+from bauh.gems.arch.exceptions import PackageNotFoundException
 
 FILE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
+def new_http_client(srcinfos: Dict[str, str], infos: Optional[List[dict]] = None) -> Mock:
+    """
+    :param srcinfos: package base -> .SRCINFO content
+    :param infos: the AUR 'info' results
+    """
+    def get(url: str) -> Optional[Mock]:
+        if url.startswith(aur.URL_SRC_INFO):
+            text = srcinfos.get(url.split('=')[-1])
+            return Mock(text=text) if text else None
+
+        data = {'results': infos or []}
+        return Mock(content=json.dumps(data).encode(), json=Mock(return_value=data))
+
+    http_client = Mock()
+    http_client.get.side_effect = get
+    return http_client
+
+
 class AURModuleTest(TestCase):
 
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        cache_patch = patch('bauh.gems.arch.aur.AUR_SRCINFO_CACHE_DIR', self.cache_dir.name)
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+        self.addCleanup(self.cache_dir.cleanup)
+
     def test_map_srcinfo__only_one_pkgname(self):
         expected_fields = {
             'pkgbase': 'bauh',
@@ -264,3 +301,252 @@ class AURModuleTest(TestCase):
                 res[key].sort()
 
             self.assertEqual(val, res[key], "expected: {}. current: {}".format(val, res[key]))
+
+    def test_map_pkgbuild__must_strip_quotes_and_parenthesis(self):
+        pkgbuild = "# Maintainer: xpto\npkgname='bauh'\npkgver=0.9.6\ndepends=('python' \"python-requests\")\n"
+
+        res = aur.map_pkgbuild(pkgbuild)
+        self.assertEqual({'pkgname': 'bauh', 'pkgver': '0.9.6', 'depends': 'python python-requests'}, res)
+
+    def test_get_info__must_split_the_names_in_batches(self):
+        http_client = Mock()
+
+        def get(url: str) -> Mock:
+            data = {'results': [{'Name': n.split('=')[1]} for n in url.split('&') if n.startswith('arg')]}
+            return Mock(content=json.dumps(data).encode(), json=Mock(return_value=data))
+
+        http_client.get.side_effect = get
+
+        names = ['pkg{}'.format(i) for i in range(aur.AUR_INFO_BATCH * 2 + 1)]
+        res = aur.AURClient(http_client=http_client, logger=Mock(), x86_64=True).get_info(names)
+
+        self.assertEqual(3, http_client.get.call_count)
+        self.assertEqual(names, [i['Name'] for i in res])
+
+    def test_map_srcinfo__must_keep_the_declaration_order_of_list_fields(self):
+        srcinfo = 'pkgbase = xpto\n\tpkgver = 1.0\n\tsource = b.tar.gz\n\tsource = a.tar.gz\n\tsha256sums = 222\n\tsha256sums = 111\n\npkgname = xpto\n'
+
+        res = aur.map_srcinfo(srcinfo, 'xpto')
+        self.assertEqual(['b.tar.gz', 'a.tar.gz'], res['source'])
+        self.assertEqual(['222', '111'], res['sha256sums'])
+
+    def test_read_index_lines__must_read_plain_and_gzip_contents(self):
+        content = b'# AUR package list\nbauh\nmangohud\n'
+
+        for body in (content, gzip.compress(content)):
+            res = Mock()
+            res.raw = io.BytesIO(body)
+            self.assertEqual(['# AUR package list', 'bauh', 'mangohud'], [*aur.AURClient._read_index_lines(res)])
+
+    def test_strip_dep_version(self):
+        self.assertEqual('python', aur.strip_dep_version('python'))
+        self.assertEqual('python', aur.strip_dep_version('python>=3.5'))
+        self.assertEqual('python', aur.strip_dep_version('python<=3.9'))
+        self.assertEqual('python', aur.strip_dep_version('python=3.8.1-1'))
+        self.assertEqual('python', aur.strip_dep_version('python>3'))
+        self.assertEqual('python', aur.strip_dep_version('python<4'))
+
+    def test_map_srcinfo__several_pkgnames__pkgname_specified__fields_without_pkgname(self):
+        with open(FILE_DIR + '/resources/mangohud_srcinfo') as f:
+            srcinfo = f.read()
+
+        res = aur.map_srcinfo(srcinfo, 'lib32-mangohud', fields={'pkgdesc', 'depends'})
+        self.assertEqual({'pkgdesc': 'A Vulkan overlay layer for monitoring FPS, temperatures, CPU/GPU load and more (32-bit)',
+                          'depends': ['lib32-gcc-libs', 'mangohud', 'mangohud-common']}, res)
+
+    def test_read_index_lines__must_not_break_lines_between_chunks(self):
+        names = ['package-{}'.format(i) for i in range(aur.INDEX_CHUNK_SIZE // 5)]
+
+        res = Mock()
+        res.raw = io.BytesIO('\n'.join(names).encode())
+        self.assertEqual(names, [*aur.AURClient._read_index_lines(res)])
+
+    def test_map_srcinfo__must_keep_repeated_values_of_positional_fields(self):
+        srcinfo = 'pkgbase = xpto\n\tpkgver = 1.0\n\tsource = a.tar.gz\n\tsource = b.patch\n\tsource = c.patch\n' \
+                  '\tsha256sums = SKIP\n\tsha256sums = 111\n\tsha256sums = SKIP\n\tdepends = python\n\tdepends = python\n\n' \
+                  'pkgname = xpto\n'
+
+        res = aur.map_srcinfo(srcinfo, 'xpto')
+        self.assertEqual(['a.tar.gz', 'b.patch', 'c.patch'], res['source'])
+        self.assertEqual(['SKIP', '111', 'SKIP'], res['sha256sums'])
+        self.assertEqual(['python'], res['depends'])
+
+    def test_get_src_info_many__split_packages_must_get_their_own_data(self):
+        with open(FILE_DIR + '/resources/mangohud_srcinfo') as f:
+            http_client = new_http_client(srcinfos={'mangohud': f.read()},
+                                          infos=[{'Name': 'mangohud-common', 'PackageBase': 'mangohud'},
+                                                 {'Name': 'lib32-mangohud', 'PackageBase': 'mangohud'}])
+
+        client = aur.AURClient(http_client=http_client, logger=Mock(), x86_64=True)
+        res = client.get_src_info_many(['mangohud-common', 'lib32-mangohud'])
+
+        self.assertEqual('Common files for mangohud and lib32-mangohud', res['mangohud-common']['pkgdesc'])
+        self.assertEqual('A Vulkan overlay layer for monitoring FPS, temperatures, CPU/GPU load and more (32-bit)',
+                         res['lib32-mangohud']['pkgdesc'])
+        self.assertNotIn('mangohud', client.srcinfo_cache)
+
+        srcinfo_requests = [c for c in http_client.get.call_args_list if c[0][0].startswith(aur.URL_SRC_INFO)]
+        self.assertEqual(1, len(srcinfo_requests))  # the base .SRCINFO is downloaded once
+
+        client.clean_caches()  # the data cached on disk must be the one of each package
+        self.assertEqual(res['lib32-mangohud'], client.get_src_info('lib32-mangohud', latest_version='0.5.1-3'))
+        self.assertEqual(1, len([c for c in http_client.get.call_args_list if c[0][0].startswith(aur.URL_SRC_INFO)]))
+
+    def _new_bauh_client(self) -> aur.AURClient:
+        with open(FILE_DIR + '/resources/bauh_srcinfo') as f:
+            return aur.AURClient(http_client=new_http_client(srcinfos={'bauh': f.read()}), logger=Mock(), x86_64=True)
+
+    def test_get_src_info__must_write_the_mapped_data_on_disk(self):
+        client = self._new_bauh_client()
+        srcinfo = client.get_src_info('bauh')
+
+        with open('{}/bauh.json'.format(self.cache_dir.name)) as f:
+            self.assertEqual(srcinfo, json.load(f))
+
+    def test_get_src_info__must_read_the_data_cached_on_disk(self):
+        client = self._new_bauh_client()
+        srcinfo = client.get_src_info('bauh')
+        client.clean_caches()
+
+        self.assertEqual(srcinfo, client.get_src_info('bauh', latest_version='0.9.6-2'))
+        self.assertEqual(1, client.http_client.get.call_count)
+
+    def test_get_src_info__must_not_read_the_data_cached_on_disk_without_the_aur_data(self):
+        client = self._new_bauh_client()
+        client.get_src_info('bauh')
+        client.clean_caches()
+
+        self.assertEqual('0.9.6', client.get_src_info('bauh')['pkgver'])
+        self.assertEqual(2, client.http_client.get.call_count)
+
+    def test_clean_caches__must_remove_the_expired_data_cached_on_disk(self):
+        client = self._new_bauh_client()
+        client.get_src_info('bauh')
+
+        cache_file = '{}/bauh.json'.format(self.cache_dir.name)
+        client.clean_caches()
+        self.assertTrue(os.path.exists(cache_file))
+
+        expired = time.time() - aur.SRCINFO_CACHE_EXPIRATION - 1
+        os.utime(cache_file, (expired, expired))
+        client.clean_caches()
+        self.assertFalse(os.path.exists(cache_file))
+
+    def test_get_src_info__must_ignore_data_cached_on_disk_before_the_last_modification(self):
+        client = self._new_bauh_client()
+        client.get_src_info('bauh')
+        client.clean_caches()
+
+        client.get_src_info('bauh', last_modified=int(time.time()) + 60)
+        self.assertEqual(2, client.http_client.get.call_count)
+
+    def test_get_src_info__must_ignore_cached_data_of_a_different_version(self):
+        client = self._new_bauh_client()
+        client.get_src_info('bauh')
+        client.clean_caches()
+
+        client.get_src_info('bauh', latest_version='0.9.7-1')
+        self.assertEqual(2, client.http_client.get.call_count)
+
+        client.get_src_info('bauh', latest_version='0.9.7-1')  # the in-memory data is also checked
+        self.assertEqual(3, client.http_client.get.call_count)
+
+    def test_run_threads__must_not_wait_for_a_slow_call_to_start_the_next_ones(self):
+        last_started, calls = Event(), []
+
+        def target(idx: int):
+            if idx == 0:  # only finishes after the last call starts
+                last_started.wait(timeout=5)
+
+            calls.append(idx)
+
+            if idx == 5:
+                last_started.set()
+
+            return idx * 2
+
+        res = aur.run_threads(target, [(i,) for i in range(6)], max_workers=2)
+        self.assertEqual(0, calls[-1])
+        self.assertEqual([0, 2, 4, 6, 8, 10], res)  # in the order of the arguments
+
+    def test_run_threads__must_raise_the_errors_of_the_calls(self):
+        def target(idx: int):
+            if idx == 1:
+                raise ValueError()
+
+            return idx
+
+        self.assertRaises(ValueError, aur.run_threads, target, [(i,) for i in range(3)])
+
+    def test_prefetch_src_infos__must_fill_the_srcinfo_cache(self):
+        srcinfos = {n: 'pkgbase = {n}\n\tpkgver = 1.0\n\tpkgrel = 1\n\npkgname = {n}\n'.format(n=n) for n in ('a', 'b', 'c')}
+        client = aur.AURClient(http_client=new_http_client(srcinfos=srcinfos,
+                                                           infos=[{'Name': n, 'PackageBase': n} for n in srcinfos]),
+                               logger=Mock(), x86_64=True)
+
+        client.prefetch_src_infos(['a', 'b', 'c'])
+        self.assertEqual({'a', 'b', 'c'}, {*client.srcinfo_cache.keys()})
+        self.assertEqual('1.0', client.srcinfo_cache['b']['pkgver'])
+
+        calls = client.http_client.get.call_count
+        client.get_src_info('c')
+        self.assertEqual(calls, client.http_client.get.call_count)
+
+    def test_get_src_info__must_remember_packages_not_returned_by_the_aur(self):
+        client = aur.AURClient(http_client=new_http_client(srcinfos={}, infos=[]), logger=Mock(), x86_64=True)
+
+        self.assertIsNone(client.get_src_info('xpto'))
+        self.assertEqual(2, client.http_client.get.call_count)  # .SRCINFO + AUR data
+
+        self.assertRaises(PackageNotFoundException, client.get_required_dependencies, 'xpto')
+        self.assertEqual(2, client.http_client.get.call_count)
+
+        client.clean_caches()
+        self.assertIsNone(client.get_src_info('xpto'))
+        self.assertEqual(4, client.http_client.get.call_count)
+
+    def test_get_src_info__must_not_remember_packages_whose_data_could_not_be_retrieved(self):
+        client = aur.AURClient(http_client=Mock(), logger=Mock(), x86_64=True)
+        client.http_client.get.return_value = None  # timeouts and server errors
+
+        self.assertIsNone(client.get_src_info('xpto'))
+        calls = client.http_client.get.call_count
+
+        self.assertIsNone(client.get_src_info('xpto'))
+        self.assertGreater(client.http_client.get.call_count, calls)
+
+    @patch('time.sleep')
+    def test_get_info__must_retry_after_a_connection_error(self, sleep: Mock):
+        data = {'results': [{'Name': 'bauh'}]}
+        http_client = Mock()
+        http_client.get.side_effect = [requests.exceptions.ConnectionError(),
+                                       Mock(content=json.dumps(data).encode(), json=Mock(return_value=data))]
+
+        res = aur.AURClient(http_client=http_client, logger=Mock(), x86_64=True).get_info(['bauh'])
+        self.assertEqual(data['results'], res)
+        self.assertEqual(2, http_client.get.call_count)
+        sleep.assert_called_once()
+
+    def test_get_src_info_many__must_validate_the_data_cached_on_disk_with_the_aur_data(self):
+        with open(FILE_DIR + '/resources/bauh_srcinfo') as f:
+            http_client = new_http_client(srcinfos={'bauh': f.read()},
+                                          infos=[{'Name': 'bauh', 'PackageBase': 'bauh', 'Version': '0.9.6-2',
+                                                  'LastModified': int(time.time()) - 60}])
+
+        client = aur.AURClient(http_client=http_client, logger=Mock(), x86_64=True)
+        srcinfo = client.get_src_info_many(['bauh'])['bauh']
+        client.clean_caches()
+
+        self.assertEqual({'bauh': srcinfo}, client.get_src_info_many(['bauh']))
+        self.assertEqual(3, http_client.get.call_count)  # 2 'info' requests + 1 .SRCINFO
+
+    @patch('time.sleep')
+    def test_get_info__must_not_retry_when_the_connection_cannot_be_established(self, sleep: Mock):
+        offline = urllib3.exceptions.MaxRetryError(pool=None, url=aur.URL_INFO,
+                                                   reason=urllib3.exceptions.NewConnectionError(None, 'Name resolution failed'))
+        http_client = Mock()
+        http_client.get.side_effect = requests.exceptions.ConnectionError(offline)
+
+        self.assertEqual([], aur.AURClient(http_client=http_client, logger=Mock(), x86_64=True).get_info(['bauh']))
+        self.assertEqual(1, http_client.get.call_count)
+        sleep.assert_not_called()